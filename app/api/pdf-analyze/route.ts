@@ -7,7 +7,6 @@
 
 import { NextRequest, NextResponse } from 'next/server';
 import jwt from 'jsonwebtoken';
-import pdfParse from 'pdf-parse-fixed';
 import { analyzeTextWithEnvKey, analyzeLargeTextInChunks } from '@/lib/services/aiService';
 import connectToDatabase from '@/lib/mongodb';
 
@@ -49,10 +48,9 @@ function getUserIdFromToken(request: NextRequest): string | null {
   }
 }
 
-// Función para optimizar texto
+// Función para optimizar texto (`\s+` ya incluye los saltos de línea)
 function optimizeTextForAnalysis(text: string): string {
   return text
-    .replace(/\n+/g, ' ')
     .replace(/\s+/g, ' ')
     .replace(/[^\w\s\u00C0-\u017F.,;:!?()[\]{}"'-]/g, '')
     .trim();
@@ -111,6 +109,9 @@ export async function POST(request: NextRequest) {
     console.log('📄 Extrayendo texto del PDF...');
     let extractedText = '';
 
+    // pdf-parse (incluye pdf.js) se carga recién aquí, cuando ya se validó la solicitud
+    const { default: pdfParse } = await import('pdf-parse-fixed');
+
     try {
       const data = await pdfParse(buffer);
       extractedText = data.text;
@@ -123,7 +124,7 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    if (!extractedText || extractedText.trim().length === 0) {
+    if (!extractedText || !/\S/.test(extractedText)) {
       return NextResponse.json(
         { error: 'No se pudo extraer texto del PDF. El archivo puede estar vacío o contener solo imágenes.' },
         { status: 400 }
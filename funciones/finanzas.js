@@ -44,6 +44,207 @@ const ReportPeriod = {
     CURRENT_YEAR: 'current-year'
 };
 
+/**
+ * Operaciones de bancos uruguayos que preceden a un monto
+ * Se combinan en un único patrón para recorrer cada línea una sola vez en
+ * lugar de una vez por operación. Las variantes más largas ("Retiro de
+ * cajero", "Pago de") siguen funcionando porque la alternativa retrocede
+ * cuando lo que sigue a la más corta no es un monto.
+ */
+const BANKING_OPERATION_KEYWORDS = [
+    // Débitos y cargos
+    String.raw`D[ée]bito\s+por`,
+    String.raw`Cargo\s+por`,
+    String.raw`Débito\s+automático`,
+    String.raw`Cargo\s+automático`,
+
+    // Extracciones y retiros
+    String.raw`Extracci[oó]n`,
+    String.raw`Retiro`,
+    String.raw`Retiro\s+de\s+cajero`,
+    String.raw`Cajero\s+automático`,
+
+    // Compras y pagos
+    String.raw`Compra`,
+    String.raw`Pago`,
+    String.raw`Pago\s+de`,
+    String.raw`Abono\s+a`,
+
+    // Transferencias
+    String.raw`Transferencia`,
+    String.raw`Transferencia\s+saliente`,
+    String.raw`Envío`,
+
+    // Servicios específicos uruguayos
+    String.raw`UTE`,
+    String.raw`OSE`,
+    String.raw`Antel`,
+    String.raw`Movistar`,
+    String.raw`Claro`
+];
+
+/**
+ * Patrones exhaustivos para extractos bancarios uruguayos
+ * Se compilan una sola vez al cargar el módulo en lugar de en cada llamada.
+ * Todos usan el flag `g` y se recorren con `exec`: como se comparten entre
+ * llamadas, `lastIndex` se reinicia antes de cada recorrido (si un recorrido se
+ * interrumpe por una excepción, la línea siguiente no empieza a mitad de texto).
+ */
+const BANKING_AMOUNT_PATTERNS = [
+    // === PATRONES ESPECÍFICOS DE BANCOS URUGUAYOS ===
+    new RegExp(String.raw`(?:${BANKING_OPERATION_KEYWORDS.join('|')})\s+([\d,]+\.?\d*)`, 'gi'),
+
+    // === PATRONES CON SÍMBOLOS DE MONEDA ===
+
+    // Pesos uruguayos
+    /\$U\s*([\d,]+\.?\d*)/gi,
+    /UYU\s*([\d,]+\.?\d*)/gi,
+    /\$UY\s*([\d,]+\.?\d*)/gi,
+
+    // Dólares
+    /USD\s*([\d,]+\.?\d*)/gi,
+    /U\$S\s*([\d,]+\.?\d*)/gi,
+
+    // Símbolos genéricos (contexto)
+    /\$[\s]*([\d,]+\.?\d*)/g,
+
+    // === FORMATOS NUMÉRICOS URUGUAYOS ===
+
+    // Formato uruguayo: 1.234,56 (sin tomar "1.234,56" de "1.234,567")
+    /(\d{1,3}(?:\.\d{3})*,\d{2})(?!\d)\s*(?:\$|USD|UYU)?/g,
+
+    // Formato americano: 1,234.56 (sin tomar "1.25" de "1.250")
+    /(\d{1,3}(?:,\d{3})*\.\d{2})(?!\d)\s*(?:\$|USD|UYU)?/g,
+
+    // Números simples con contexto de gasto
+    /\b(\d+\.\d{2})\b/g,
+
+    // === PATRONES AVANZADOS ===
+
+    // Líneas que contienen fechas + montos
+    /(\d{1,2}\/\d{1,2}\/\d{2,4}).*?([\d,]+\.?\d*)/gi,
+
+    // Cualquier línea con monto al final (las líneas llegan recortadas,
+    // por lo que no hace falta `\s*` antes de `$`)
+    /(.{10,80})\s+([\d,]+\.?\d*)$/gm
+];
+
+/**
+ * Coma decimal sin puntos de miles (ej: "450,00"); con tres dígitos se
+ * interpreta como separador de miles americano ("1,250")
+ */
+const DECIMAL_COMMA_PATTERN = /,\d{1,2}$/;
+
+/**
+ * Solo puntos de miles uruguayos (ej: "1.250", "1.234.567"): al igual que la
+ * coma, un punto seguido de tres dígitos separa miles y no decimales
+ */
+const THOUSANDS_DOT_PATTERN = /^[1-9]\d{0,2}(?:\.\d{3})+$/;
+
+/**
+ * Captura compuesta solo por dígitos y separadores: algunos patrones capturan
+ * la fecha o la descripción en el primer grupo en lugar del monto
+ */
+const AMOUNT_TEXT_PATTERN = /^[\d.,]+$/;
+
+/**
+ * Todos los patrones de monto requieren al menos un dígito: las líneas que
+ * no lo tienen (headers, pies de página) se descartan sin recorrer la lista
+ */
+const HAS_DIGIT_PATTERN = /\d/;
+
+/**
+ * Palabras/patrones de líneas a ignorar (headers, información de cuenta, etc.)
+ */
+const LINE_IGNORE_PATTERNS = [
+    'saldo',
+    'total',
+    'cuenta',
+    'número',
+    'titular',
+    'fecha',
+    'período',
+    'desde',
+    'hasta',
+    'página',
+    'banco',
+    'sucursal',
+    'movimiento',
+    'descripción',
+    'importe',
+    'débito',
+    'crédito',
+    'balance',
+    'disponible',
+    /^\d{4,}$/, // Números largos (posiblemente números de cuenta)
+    /cta\.?\s*\d+/, // Números de cuenta
+    /cbu/i, // Códigos bancarios
+];
+
+/**
+ * Palabras que indican gastos reales
+ */
+const EXPENSE_INDICATORS = [
+    'compra',
+    'pago',
+    'extracción',
+    'retiro',
+    'débito',
+    'cargo',
+    'abono',
+    'transferencia',
+    'envío',
+    'depósito', // Solo si no es ingreso
+    'ute',
+    'ose',
+    'antel',
+    'movistar',
+    'claro',
+    'supermercado',
+    'restaurante',
+    'farmacia',
+    'estacionamiento',
+    'peaje',
+    'taxi',
+    'ómnibus',
+    'combustible',
+    'gasolina'
+];
+
+/**
+ * Palabras que indican ingresos
+ */
+const INCOME_INDICATORS = [
+    'ingreso',
+    'depósito',
+    'crédito',
+    'acreditación',
+    'transferencia entrante',
+    'recepción'
+];
+
+/**
+ * Combina una lista de palabras (y patrones) en una única regex, para revisar
+ * la línea en un solo recorrido en lugar de un `includes` por palabra.
+ * Se aplican sobre la línea en minúsculas, por eso no necesitan el flag `i`.
+ */
+function buildKeywordPattern(keywords) {
+    return new RegExp(keywords
+        .map(keyword => typeof keyword === 'string'
+            ? keyword.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')
+            : keyword.source)
+        .join('|'));
+}
+
+const LINE_IGNORE_PATTERN = buildKeywordPattern(LINE_IGNORE_PATTERNS);
+const EXPENSE_INDICATOR_PATTERN = buildKeywordPattern(EXPENSE_INDICATORS);
+const INCOME_INDICATOR_PATTERN = buildKeywordPattern(INCOME_INDICATORS);
+
+/**
+ * Fecha en formato DD/MM/AAAA o DD-MM-AA (sin flag `g`: se reutiliza con `exec`)
+ */
+const BANKING_DATE_PATTERN = /(\d{1,2})[\/\-](\d{1,2})[\/\-](\d{2,4})/;
+
 // ==================== CLASE PRINCIPAL DE FINANZAS ====================
 
 /**
@@ -4077,35 +4278,47 @@ class FinanceApp {
                     }
 
                     async function extractText() {
+                        let pdf = null;
                         try {
                             const arrayBuffer = fileReader.result;
-                            const pdf = await pdfjsLib.getDocument(arrayBuffer).promise;
-                            let fullText = '';
-
+                            pdf = await pdfjsLib.getDocument(arrayBuffer).promise;
+                            // Acumular el texto por página y unirlo una sola vez al final
+                            const pageTexts = [];
 
                             for (let i = 1; i <= pdf.numPages; i++) {
 
                                 const page = await pdf.getPage(i);
                                 const textContent = await page.getTextContent();
 
+                                // Recorrer los items una sola vez, descartando strings vacíos
+                                const pageStrings = [];
+                                for (const item of textContent.items) {
+                                    if (item.str.trim().length > 0) {
+                                        pageStrings.push(item.str);
+                                    }
+                                }
+
                                 // Extraer texto preservando mejor el formato
-                                const pageText = textContent.items
-                                    .map(item => item.str)
-                                    .filter(str => str.trim().length > 0) // Filtrar strings vacíos
+                                const pageText = pageStrings
                                     .join(' ')
                                     .replace(/\s+/g, ' ') // Normalizar espacios
                                     .trim();
 
-                                fullText += pageText + '\n\n';
+                                pageTexts.push(pageText, '\n\n');
 
-                                // Log de preview para debug
-                                const preview = pageText.substring(0, 200);
+                                // Liberar los recursos de la página ya procesada
+                                page.cleanup();
                             }
 
-
-                            resolve(fullText);
+                            resolve(pageTexts.join(''));
                         } catch (error) {
                             reject(error);
+                        } finally {
+                            // El documento no se vuelve a usar una vez extraído el texto;
+                            // un fallo al liberarlo no debe quedar como rechazo sin manejar
+                            if (pdf) {
+                                pdf.destroy().catch(() => {});
+                            }
                         }
                     }
                 } catch (error) {
@@ -4412,78 +4625,6 @@ class FinanceApp {
         const expenses = [];
         const lines = text.split('\n');
 
-
-        // Patrones exhaustivos para extractos bancarios uruguayos
-        const bankingPatterns = [
-            // === PATRONES ESPECÍFICOS DE BANCOS URUGUAYOS ===
-
-            // Débitos y cargos
-            /D[ée]bito\s+por\s+([\d,]+\.?\d*)/gi,
-            /Cargo\s+por\s+([\d,]+\.?\d*)/gi,
-            /Débito\s+automático\s+([\d,]+\.?\d*)/gi,
-            /Cargo\s+automático\s+([\d,]+\.?\d*)/gi,
-
-            // Extracciones y retiros
-            /Extracci[oó]n\s+([\d,]+\.?\d*)/gi,
-            /Retiro\s+([\d,]+\.?\d*)/gi,
-            /Retiro\s+de\s+cajero\s+([\d,]+\.?\d*)/gi,
-            /Cajero\s+automático\s+([\d,]+\.?\d*)/gi,
-
-            // Compras y pagos
-            /Compra\s+([\d,]+\.?\d*)/gi,
-            /Pago\s+([\d,]+\.?\d*)/gi,
-            /Pago\s+de\s+([\d,]+\.?\d*)/gi,
-            /Abono\s+a\s+([\d,]+\.?\d*)/gi,
-
-            // Transferencias
-            /Transferencia\s+([\d,]+\.?\d*)/gi,
-            /Transferencia\s+saliente\s+([\d,]+\.?\d*)/gi,
-            /Envío\s+([\d,]+\.?\d*)/gi,
-
-            // Servicios específicos uruguayos
-            /UTE\s+([\d,]+\.?\d*)/gi,
-            /OSE\s+([\d,]+\.?\d*)/gi,
-            /Antel\s+([\d,]+\.?\d*)/gi,
-            /Movistar\s+([\d,]+\.?\d*)/gi,
-            /Claro\s+([\d,]+\.?\d*)/gi,
-
-            // === PATRONES CON SÍMBOLOS DE MONEDA ===
-
-            // Pesos uruguayos
-            /\$U\s*([\d,]+\.?\d*)/gi,
-            /UYU\s*([\d,]+\.?\d*)/gi,
-            /\$UY\s*([\d,]+\.?\d*)/gi,
-
-            // Dólares
-            /USD\s*([\d,]+\.?\d*)/gi,
-            /U\$S\s*([\d,]+\.?\d*)/gi,
-
-            // Símbolos genéricos (contexto)
-            /\$[\s]*([\d,]+\.?\d*)/g,
-
-            // === FORMATOS NUMÉRICOS URUGUAYOS ===
-
-            // Formato uruguayo: 1.234,56
-            /(\d{1,3}(?:\.\d{3})*,\d{2})\s*(?:\$|USD|UYU)?/g,
-
-            // Formato americano: 1,234.56
-            /(\d{1,3}(?:,\d{3})*\.\d{2})\s*(?:\$|USD|UYU)?/g,
-
-            // Números simples con contexto de gasto
-            /\b(\d+\.\d{2})\b/g,
-
-            // === PATRONES AVANZADOS ===
-
-            // Líneas que contienen fechas + montos
-            /(\d{1,2}\/\d{1,2}\/\d{2,4}).*?([\d,]+\.?\d*)/gi,
-
-            // Descripciones + montos
-            /([A-Za-z\s]{10,50})\s+([\d,]+\.?\d*)/gi,
-
-            // Cualquier línea con monto al final
-            /(.{10,80})\s+([\d,]+\.?\d*)\s*$/gm
-        ];
-
         let processedLines = 0;
         let potentialAmounts = 0;
 
@@ -4494,14 +4635,24 @@ class FinanceApp {
             // Limpiar y normalizar la línea
             const cleanLine = line.trim();
             if (cleanLine.length < 5) return; // Ignorar líneas muy cortas
+            if (!HAS_DIGIT_PATTERN.test(cleanLine)) return; // Sin dígitos no hay montos
 
             // Ignorar líneas que parecen ser headers o información de cuenta
             if (this.isLineToIgnore(cleanLine)) return;
 
+            // Verificar que la línea contenga palabras relacionadas con gastos antes de
+            // recorrer los patrones: si no las tiene, ninguno de sus montos se usaría
+            if (!this.isLikelyExpense(cleanLine)) return;
+
             processedLines++;
 
-            bankingPatterns.forEach(pattern => {
+            // Moneda, categoría y fecha dependen solo de la línea: se calculan una vez
+            // (al encontrar el primer gasto) y se comparten entre todos sus montos
+            let lineDetails = null;
+
+            BANKING_AMOUNT_PATTERNS.forEach(pattern => {
                 let match;
+                pattern.lastIndex = 0;
                 while ((match = pattern.exec(cleanLine)) !== null) {
                     const amountStr = match[1];
                     if (amountStr) {
@@ -4509,23 +4660,27 @@ class FinanceApp {
 
                         // Filtros más estrictos
                         if (amount > 0.5 && amount < 50000 && !processedAmounts.has(amountStr)) {
-                            // Verificar que la línea contenga palabras relacionadas con gastos
-                            if (this.isLikelyExpense(cleanLine)) {
-                                potentialAmounts++;
-                                processedAmounts.add(amountStr);
+                            potentialAmounts++;
+                            processedAmounts.add(amountStr);
 
-                                // Extraer descripción del contexto
-                                const description = this.extractExpenseDescription(cleanLine, amount);
+                            // Extraer descripción del contexto
+                            const description = this.extractExpenseDescription(cleanLine, amount, amountStr);
 
-                                expenses.push({
-                                    amount: amount,
-                                    description: description,
+                            if (!lineDetails) {
+                                lineDetails = {
                                     currency: this.detectCurrencyFromLine(cleanLine),
                                     category: this.categorizeBankingExpense(cleanLine),
                                     date: this.extractDateFromLine(cleanLine, lines, index)
-                                });
-
+                                };
                             }
+
+                            expenses.push({
+                                amount: amount,
+                                description: description,
+                                currency: lineDetails.currency,
+                                category: lineDetails.category,
+                                date: lineDetails.date
+                            });
                         }
                     }
                 }
@@ -4541,14 +4696,22 @@ class FinanceApp {
      */
     parseBankingAmount(amountStr) {
         try {
-            // Manejar formato uruguayo: 1.234,56
-            if (amountStr.includes('.') && amountStr.includes(',')) {
-                return parseFloat(amountStr.replace(/\./g, '').replace(',', '.'));
+            // El separador que aparece último es el decimal
+            const lastDot = amountStr.lastIndexOf('.');
+            const lastComma = amountStr.lastIndexOf(',');
+
+            // Manejar formato uruguayo: 1.234,56 (primero se quitan los puntos de miles)
+            if (lastComma > lastDot && (lastDot !== -1 || DECIMAL_COMMA_PATTERN.test(amountStr))) {
+                return parseFloat(this.normalizeUruguayanAmount(amountStr));
             }
             // Manejar formato americano: 1,234.56
-            else if (amountStr.includes(',') && amountStr.includes('.')) {
+            else if (lastDot > lastComma && lastComma !== -1) {
                 return parseFloat(amountStr.replace(/,/g, ''));
             }
+            // Manejar formato uruguayo sin decimales: 1.250 (los puntos son de miles)
+            else if (lastComma === -1 && THOUSANDS_DOT_PATTERN.test(amountStr)) {
+                return parseFloat(amountStr.replace(/\./g, ''));
+            }
             // Otros formatos
             else {
                 return parseFloat(amountStr.replace(/[^\d.]/g, ''));
@@ -4558,13 +4721,33 @@ class FinanceApp {
         }
     }
 
+    /**
+     * Convierte un monto uruguayo (1.234,56) a notación decimal con punto (1234.56)
+     * en una sola pasada: descarta los puntos de miles y cambia la coma por punto
+     */
+    normalizeUruguayanAmount(amountStr) {
+        let normalized = '';
+        for (let i = 0; i < amountStr.length; i++) {
+            const char = amountStr[i];
+            if (char === ',') {
+                normalized += '.';
+            } else if (char !== '.') {
+                normalized += char;
+            }
+        }
+        return normalized;
+    }
+
     /**
      * Extrae descripción del gasto desde el contexto de la línea
      */
-    extractExpenseDescription(line, amount) {
-        // Remover el monto y limpiar la línea
+    extractExpenseDescription(line, amount, amountStr) {
+        // Remover el monto tal como aparece en la línea (texto literal, sin compilar una
+        // regex por gasto; sirve para 1.234,56 y 1,234.56). Si la captura no es un monto
+        // (fecha o descripción), se remueve el monto tal como se imprime
+        const amountText = AMOUNT_TEXT_PATTERN.test(amountStr) ? amountStr : amount.toString();
         const cleanLine = line
-            .replace(new RegExp(amount.toString(), 'g'), '')
+            .split(amountText).join('')
             .replace(/[^\w\sáéíóúñü]/gi, ' ')
             .replace(/\s+/g, ' ')
             .trim();
@@ -4632,39 +4815,7 @@ class FinanceApp {
     isLineToIgnore(line) {
         const lowerLine = line.toLowerCase();
 
-        // Ignorar líneas que contienen estas palabras/patrones
-        const ignorePatterns = [
-            'saldo',
-            'total',
-            'cuenta',
-            'número',
-            'titular',
-            'fecha',
-            'período',
-            'desde',
-            'hasta',
-            'página',
-            'banco',
-            'sucursal',
-            'movimiento',
-            'descripción',
-            'importe',
-            'débito',
-            'crédito',
-            'balance',
-            'disponible',
-            /^\d{4,}$/, // Números largos (posiblemente números de cuenta)
-            /cta\.?\s*\d+/, // Números de cuenta
-            /cbu/i, // Códigos bancarios
-        ];
-
-        return ignorePatterns.some(pattern => {
-            if (typeof pattern === 'string') {
-                return lowerLine.includes(pattern);
-            } else {
-                return pattern.test(lowerLine);
-            }
-        });
+        return LINE_IGNORE_PATTERN.test(lowerLine);
     }
 
     /**
@@ -4673,52 +4824,11 @@ class FinanceApp {
     isLikelyExpense(line) {
         const lowerLine = line.toLowerCase();
 
-        // Palabras que indican gastos reales
-        const expenseIndicators = [
-            'compra',
-            'pago',
-            'extracción',
-            'retiro',
-            'débito',
-            'cargo',
-            'abono',
-            'transferencia',
-            'envío',
-            'depósito', // Solo si no es ingreso
-            'ute',
-            'ose',
-            'antel',
-            'movistar',
-            'claro',
-            'supermercado',
-            'restaurante',
-            'farmacia',
-            'estacionamiento',
-            'peaje',
-            'taxi',
-            'ómnibus',
-            'combustible',
-            'gasolina'
-        ];
-
         // Verificar si contiene indicadores de gasto
-        const hasExpenseIndicator = expenseIndicators.some(indicator =>
-            lowerLine.includes(indicator)
-        );
+        const hasExpenseIndicator = EXPENSE_INDICATOR_PATTERN.test(lowerLine);
 
         // Verificar que no contenga indicadores de ingreso
-        const incomeIndicators = [
-            'ingreso',
-            'depósito',
-            'crédito',
-            'acreditación',
-            'transferencia entrante',
-            'recepción'
-        ];
-
-        const hasIncomeIndicator = incomeIndicators.some(indicator =>
-            lowerLine.includes(indicator)
-        );
+        const hasIncomeIndicator = INCOME_INDICATOR_PATTERN.test(lowerLine);
 
         return hasExpenseIndicator && !hasIncomeIndicator;
     }
@@ -4728,8 +4838,7 @@ class FinanceApp {
      */
     extractDateFromLine(line, allLines, currentIndex) {
         // Buscar fechas en la línea actual y líneas cercanas
-        const datePattern = /(\d{1,2})[\/\-](\d{1,2})[\/\-](\d{2,4})/g;
-        const match = datePattern.exec(line);
+        const match = BANKING_DATE_PATTERN.exec(line);
 
         if (match) {
             const day = match[1].padStart(2, '0');
@@ -4750,7 +4859,7 @@ class FinanceApp {
 
             const adjacentIndex = currentIndex + offset;
             if (adjacentIndex >= 0 && adjacentIndex < allLines.length) {
-                const adjacentMatch = datePattern.exec(allLines[adjacentIndex]);
+                const adjacentMatch = BANKING_DATE_PATTERN.exec(allLines[adjacentIndex]);
                 if (adjacentMatch) {
                     const day = adjacentMatch[1].padStart(2, '0');
                     const month = adjacentMatch[2].padStart(2, '0');
@@ -22,6 +22,9 @@ interface ExpenseItem {
 const OPENAI_API_KEY = process.env.OPENAI_API_KEY;
 const OPENAI_API_URL = 'https://api.openai.com/v1/chat/completions';
 
+// Máximo de chunks analizados en simultáneo (evita superar el rate limit de OpenAI)
+const MAX_CONCURRENT_CHUNKS = 3;
+
 if (!OPENAI_API_KEY) {
   console.error('❌ ERROR: OPENAI_API_KEY no está configurada');
 }
@@ -85,9 +88,14 @@ export async function getExpenseCategories(userId?: string) {
  * Analiza texto con OpenAI usando API Key del entorno
  * @param text - Texto a analizar
  * @param userId - ID del usuario (para contexto y categorías personalizadas)
+ * @param preloadedCategories - Categorías ya obtenidas (opcional, evita volver a consultarlas en cada chunk)
  * @returns Análisis de gastos con estructura {expenses: [...], confidence: number}
  */
-export async function analyzeTextWithEnvKey(text: string, userId: string) {
+export async function analyzeTextWithEnvKey(
+  text: string,
+  userId: string,
+  preloadedCategories?: { name: string; description: string }[]
+) {
   try {
     console.log('🤖 Analizando texto con OpenAI (API Key del entorno)...');
 
@@ -98,9 +106,9 @@ export async function analyzeTextWithEnvKey(text: string, userId: string) {
 
     console.log('🔑 API Key del entorno validada correctamente');
 
-    // Obtener categorías dinámicamente desde la base de datos
+    // Obtener categorías dinámicamente desde la base de datos (si no se recibieron ya)
     console.log('📂 Obteniendo categorías para análisis...');
-    const categories = await getExpenseCategories(userId);
+    const categories = preloadedCategories ?? await getExpenseCategories(userId);
 
     // Construir la lista de categorías para el prompt
     const categoryList = categories.map(cat => `   - ${cat.name} (${cat.description})`).join('\n');
@@ -212,13 +220,15 @@ INSTRUCCIONES ESPECÍFICAS PARA TABLAS BANCARIAS:
       // Extraer JSON de la respuesta
       const content = data.choices[0].message.content.trim();
 
-      // Buscar JSON en la respuesta (puede tener texto adicional)
-      const jsonMatch = content.match(/\{[\s\S]*\}/);
-      if (!jsonMatch) {
+      // Buscar JSON en la respuesta (puede tener texto adicional):
+      // desde la primera '{' hasta la última '}', sin recorrerla con una regex
+      const jsonStart = content.indexOf('{');
+      const jsonEnd = content.lastIndexOf('}');
+      if (jsonStart === -1 || jsonEnd < jsonStart) {
         throw new Error('No se encontró JSON válido en la respuesta');
       }
 
-      result = JSON.parse(jsonMatch[0]);
+      result = JSON.parse(content.slice(jsonStart, jsonEnd + 1));
       console.log('✅ JSON parseado correctamente');
 
     } catch (parseError) {
@@ -281,13 +291,24 @@ export async function analyzeLargeTextInChunks(text: string, userId: string) {
 
     console.log(`📄 Texto dividido en ${chunks.length} chunks`);
 
-    // Analizar cada chunk
-    const analyses = [];
-    for (let i = 0; i < chunks.length; i++) {
-      console.log(`📄 Procesando chunk ${i + 1}/${chunks.length}...`);
-      const chunkResult = await analyzeTextWithEnvKey(chunks[i], userId);
-      analyses.push(chunkResult);
-    }
+    // Las categorías son las mismas para todos los chunks: consultarlas una sola vez
+    const categories = await getExpenseCategories(userId);
+
+    // Analizar los chunks en paralelo (con límite de solicitudes simultáneas a OpenAI),
+    // guardando cada resultado en su posición para conservar el orden del texto
+    const analyses: any[] = new Array(chunks.length);
+    let nextChunk = 0;
+
+    const processChunks = async () => {
+      while (nextChunk < chunks.length) {
+        const i = nextChunk++;
+        console.log(`📄 Procesando chunk ${i + 1}/${chunks.length}...`);
+        analyses[i] = await analyzeTextWithEnvKey(chunks[i], userId, categories);
+      }
+    };
+
+    const workers = Math.min(MAX_CONCURRENT_CHUNKS, chunks.length);
+    await Promise.all(Array.from({ length: workers }, processChunks));
 
     // Combinar los resultados
     if (analyses.length === 1) {
@@ -297,12 +318,24 @@ export async function analyzeLargeTextInChunks(text: string, userId: string) {
     // Si hay múltiples análisis, combinarlos
     console.log('🔄 Combinando resultados de múltiples chunks...');
 
-    const combinedExpenses: ExpenseItem[] = [];
+    // Eliminar duplicados basados en descripción y monto (con tolerancia) a medida que
+    // se recorren los chunks, contando el total sin copiar todos los gastos a otro array
+    const uniqueExpenses: ExpenseItem[] = [];
+    const seen = new Set();
+    let totalExpenses = 0;
     let totalConfidence = 0;
 
     analyses.forEach(analysis => {
       if (analysis.expenses && Array.isArray(analysis.expenses)) {
-        combinedExpenses.push(...analysis.expenses);
+        totalExpenses += analysis.expenses.length;
+
+        analysis.expenses.forEach((expense: ExpenseItem) => {
+          const key = `${expense.description}-${expense.amount}-${expense.date}`;
+          if (!seen.has(key)) {
+            seen.add(key);
+            uniqueExpenses.push(expense);
+          }
+        });
       }
       totalConfidence += analysis.confidence || 0;
     });
@@ -310,19 +343,7 @@ export async function analyzeLargeTextInChunks(text: string, userId: string) {
     // Calcular confianza promedio
     const averageConfidence = totalConfidence / analyses.length;
 
-    // Eliminar duplicados basados en descripción y monto (con tolerancia)
-    const uniqueExpenses: ExpenseItem[] = [];
-    const seen = new Set();
-
-    combinedExpenses.forEach(expense => {
-      const key = `${expense.description}-${expense.amount}-${expense.date}`;
-      if (!seen.has(key)) {
-        seen.add(key);
-        uniqueExpenses.push(expense);
-      }
-    });
-
-    console.log(`✅ Combinación completada: ${uniqueExpenses.length} gastos únicos de ${combinedExpenses.length} totales`);
+    console.log(`✅ Combinación completada: ${uniqueExpenses.length} gastos únicos de ${totalExpenses} totales`);
 
     return {
       expenses: uniqueExpenses,
@@ -336,6 +357,24 @@ export async function analyzeLargeTextInChunks(text: string, userId: string) {
   }
 }
 
+/**
+ * Recorre las líneas con contenido de un texto sin crear el array completo de líneas
+ * @param text - Texto a recorrer
+ * @returns Generador de líneas no vacías (sin recortar)
+ */
+function* iterateNonEmptyLines(text: string): Generator<string> {
+  let start = 0;
+  while (start <= text.length) {
+    let end = text.indexOf('\n', start);
+    if (end === -1) end = text.length;
+
+    const line = text.slice(start, end);
+    if (/\S/.test(line)) yield line;
+
+    start = end + 1;
+  }
+}
+
 /**
  * Análisis básico de respaldo cuando falla la IA
  * @param text - Texto a analizar
@@ -346,7 +385,6 @@ async function performBasicExpenseAnalysis(text: string) {
     console.log('🔍 Realizando análisis básico de respaldo...');
 
     const expenses: ExpenseItem[] = [];
-    const lines = text.split('\n');
 
     // Patrones mejorados para detectar gastos en tablas bancarias
     const expensePatterns = [
@@ -359,7 +397,7 @@ async function performBasicExpenseAnalysis(text: string) {
       /(\d+[\.,]\d*)\s+[A-Z\s]{3,}/gi
     ];
 
-    lines.forEach(line => {
+    for (const line of iterateNonEmptyLines(text)) {
       expensePatterns.forEach(pattern => {
         let match;
         while ((match = pattern.exec(line)) !== null) {
@@ -384,7 +422,7 @@ async function performBasicExpenseAnalysis(text: string) {
           }
         }
       });
-    });
+    }
 
     console.log(`✅ Análisis básico completado: ${expenses.length} gastos identificados`);
     return { expenses };
@@ -11,7 +11,6 @@
 
 const express = require('express');
 const multer = require('multer');
-const pdfParse = require('pdf-parse-fixed');
 const { analyzeTextWithEnvKey, analyzeLargeTextInChunks } = require('../services/aiService');
 const { authenticateToken } = require('../middleware/auth');
 
@@ -31,13 +30,25 @@ const upload = multer({
 
 // ==================== FUNCIONES UTILITARIAS ====================
 
+// pdf-parse (incluye pdf.js) se carga en el primer análisis y no al arrancar el servidor
+let pdfParse = null;
+
+/**
+ * Devuelve pdf-parse, cargándolo la primera vez que se necesita
+ */
+function getPdfParse() {
+    if (!pdfParse) {
+        pdfParse = require('pdf-parse-fixed');
+    }
+    return pdfParse;
+}
+
 /**
  * Optimiza el texto extraído del PDF para análisis
  */
 function optimizeTextForAnalysis(text) {
     return text
-        .replace(/\n+/g, ' ') // Reemplaza múltiples saltos de línea con espacios
-        .replace(/\s+/g, ' ') // Reemplaza múltiples espacios con uno solo
+        .replace(/\s+/g, ' ') // Reemplaza espacios y saltos de línea múltiples con uno solo
         .replace(/[^\w\s\u00C0-\u017F.,;:!?()[\]{}"'-]/g, '') // Remueve caracteres especiales pero mantiene acentos
         .trim();
 }
@@ -61,9 +72,10 @@ router.post('/', authenticateToken, upload.single('pdf'), async (req, res) => {
         // Extraer texto del PDF usando pdf-parse
         console.log('📄 Extrayendo texto del PDF...');
         let extractedText = '';
+        const parsePdf = getPdfParse();
 
         try {
-            const data = await pdfParse(req.file.buffer);
+            const data = await parsePdf(req.file.buffer);
             extractedText = data.text;
             console.log(`📄 Texto extraído: ${extractedText.length} caracteres`);
         } catch (pdfError) {
@@ -73,7 +85,7 @@ router.post('/', authenticateToken, upload.single('pdf'), async (req, res) => {
             });
         }
 
-        if (!extractedText || extractedText.trim().length === 0) {
+        if (!extractedText || !/\S/.test(extractedText)) { // Solo espacios en blanco
             return res.status(400).json({
                 error: 'No se pudo extraer texto del PDF. El archivo puede estar vacío o contener solo imágenes.'
             });
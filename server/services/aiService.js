@@ -29,6 +29,9 @@ const Goal = require('../models/Goal');
 const OPENAI_API_KEY = process.env.OPENAI_API_KEY;
 const OPENAI_API_URL = 'https://api.openai.com/v1/chat/completions';
 
+// Máximo de chunks analizados en simultáneo (evita superar el rate limit de OpenAI)
+const MAX_CONCURRENT_CHUNKS = 3;
+
 if (!OPENAI_API_KEY) {
     console.error('❌ ERROR: OPENAI_API_KEY no está configurada en las variables de entorno');
     console.error('💡 Configura OPENAI_API_KEY en tu archivo .env');
@@ -463,11 +466,13 @@ Devuelve la respuesta en este formato JSON exacto:
             console.log('Respuesta cruda (últimos 500 chars):', aiResponse.substring(Math.max(0, aiResponse.length - 500)));
 
             // Estrategia 2: Intentar extraer JSON válido de la respuesta
-            const jsonMatch = aiResponse.match(/\{[\s\S]*\}/);
-            if (jsonMatch) {
+            // (desde la primera '{' hasta la última '}')
+            const jsonStart = aiResponse.indexOf('{');
+            const jsonEnd = aiResponse.lastIndexOf('}');
+            if (jsonStart !== -1 && jsonEnd > jsonStart) {
                 try {
-                    console.log('🔄 Intentando estrategia 1: Extracción de JSON con regex');
-                    result = JSON.parse(jsonMatch[0]);
+                    console.log('🔄 Intentando estrategia 1: Extracción del objeto JSON');
+                    result = JSON.parse(aiResponse.slice(jsonStart, jsonEnd + 1));
                     if (result.expenses && Array.isArray(result.expenses)) {
                         return result;
                     }
@@ -622,9 +627,10 @@ Devuelve la respuesta en este formato JSON exacto:
  * Analiza texto con OpenAI usando API Key del entorno (.env)
  * @param {string} text - Texto a analizar
  * @param {string} userId - ID del usuario (para contexto)
+ * @param {Array|null} preloadedCategories - Categorías ya obtenidas (opcional, evita volver a consultarlas en cada chunk)
  * @returns {Promise<Object>} Análisis de gastos
  */
-async function analyzeTextWithEnvKey(text, userId) {
+async function analyzeTextWithEnvKey(text, userId, preloadedCategories = null) {
     try {
         console.log('🤖 Analizando texto con OpenAI (API Key del entorno)...');
 
@@ -638,9 +644,9 @@ async function analyzeTextWithEnvKey(text, userId) {
         // Nota: El filtro REDIVA fue removido según los requerimientos
         console.log('🔍 Filtro REDIVA omitido (función eliminada)');
 
-        // Obtener categorías dinámicamente desde la base de datos
+        // Obtener categorías dinámicamente desde la base de datos (si no se recibieron ya)
         console.log('📂 Obteniendo categorías para análisis CSV...');
-        const categories = await getExpenseCategories(userId); // Usar userId para categorías personalizadas
+        const categories = preloadedCategories || await getExpenseCategories(userId); // Usar userId para categorías personalizadas
 
         // Construir la lista de categorías para el prompt
         const categoryList = categories.map(cat => `   - ${cat.name} (${cat.description})`).join('\n');
@@ -737,13 +743,15 @@ INSTRUCCIONES ESPECÍFICAS:
             // Extraer JSON de la respuesta
             const content = data.choices[0].message.content.trim();
 
-            // Buscar JSON en la respuesta (puede tener texto adicional)
-            const jsonMatch = content.match(/\{[\s\S]*\}/);
-            if (!jsonMatch) {
+            // Buscar JSON en la respuesta (puede tener texto adicional):
+            // desde la primera '{' hasta la última '}', sin recorrerla con una regex
+            const jsonStart = content.indexOf('{');
+            const jsonEnd = content.lastIndexOf('}');
+            if (jsonStart === -1 || jsonEnd < jsonStart) {
                 throw new Error('No se encontró JSON válido en la respuesta');
             }
 
-            result = JSON.parse(jsonMatch[0]);
+            result = JSON.parse(content.slice(jsonStart, jsonEnd + 1));
             console.log('✅ JSON parseado correctamente');
 
         } catch (parseError) {
@@ -806,15 +814,29 @@ async function analyzeLargeTextInChunks(text, userId) {
 
         console.log(`📄 Texto dividido en ${chunks.length} chunks`);
 
-        const allExpenses = [];
-        let totalConfidence = 0;
+        // Las categorías son las mismas para todos los chunks: consultarlas una sola vez
+        const categories = await getExpenseCategories(userId);
 
-        // Procesar cada chunk
-        for (let i = 0; i < chunks.length; i++) {
-            console.log(`🔍 Procesando chunk ${i + 1}/${chunks.length}...`);
+        // Procesar los chunks en paralelo (con límite de solicitudes simultáneas a OpenAI),
+        // guardando cada resultado en su posición para conservar el orden del texto
+        const chunkResults = new Array(chunks.length);
+        let nextChunk = 0;
 
-            const chunkResult = await analyzeTextWithEnvKey(chunks[i], userId);
+        const processChunks = async () => {
+            while (nextChunk < chunks.length) {
+                const i = nextChunk++;
+                console.log(`🔍 Procesando chunk ${i + 1}/${chunks.length}...`);
+                chunkResults[i] = await analyzeTextWithEnvKey(chunks[i], userId, categories);
+            }
+        };
+
+        const workers = Math.min(MAX_CONCURRENT_CHUNKS, chunks.length);
+        await Promise.all(Array.from({ length: workers }, processChunks));
+
+        const allExpenses = [];
+        let totalConfidence = 0;
 
+        for (const chunkResult of chunkResults) {
             if (chunkResult.expenses && Array.isArray(chunkResult.expenses)) {
                 allExpenses.push(...chunkResult.expenses);
             }